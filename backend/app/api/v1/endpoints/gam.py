@@ -1,11 +1,13 @@
 """GAM extraction endpoints"""
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.base import get_db
 from app.db.models import Configuration, ConfigType, SecurityAnalysis
 from app.schemas.config import GAMExtractRequest, GAMExtractResponse
-from app.services.gam_service import GAMService
-from app.services.security_service import SecurityService
+from app.services.gam_service import GAMService, get_gam_service
+from app.services.security_service import SecurityService, get_security_service
 
 router = APIRouter()
 
@@ -13,11 +15,11 @@ router = APIRouter()
 @router.post("/extract", response_model=GAMExtractResponse)
 async def extract_gam_config(
     request: GAMExtractRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    gam_service: GAMService = Depends(get_gam_service),
+    security_service: SecurityService = Depends(get_security_service)
 ):
     """Extract configuration from GAM"""
-    gam_service = GAMService()
-    
     # Extract configurations
     result = await gam_service.extract_all_configs(request.config_types)
     
@@ -30,71 +32,76 @@ async def extract_gam_config(
             detail=f"Failed to extract configurations: {errors}"
         )
     
-    # Count total items
-    total_items = sum(
-        len(data) if isinstance(data, list) else 1
-        for data in result["data"].values()
-    )
-    
     # Determine which types failed
-    failed_types = [t for t in request.config_types if t.value not in result["data"]]
+    extracted_types = set(result["data"])
+    failed_types = [t for t in request.config_types if t.value not in extracted_types]
+    failed_type_values = [t.value for t in failed_types]
+    requested_type_values = ", ".join(t.value for t in request.config_types)
+    
+    config_type = request.config_types[0] if len(request.config_types) == 1 else ConfigType.OTHER
+    
+    # Automatically run security analysis on the extracted configuration
+    # (in a worker thread so the event loop keeps serving other requests)
+    findings = await asyncio.to_thread(
+        security_service.analyze_configuration,
+        result["data"],
+        config_type
+    )
     
     # Save to database
     config_name = request.template_name if request.save_as_template else f"GAM Extract {', '.join(result['data'].keys())}"
     
     db_config = Configuration(
         name=config_name,
-        description=f"Extracted from GAM - Types: {', '.join([t.value for t in request.config_types])}",
-        config_type=request.config_types[0] if len(request.config_types) == 1 else ConfigType.OTHER,
+        description=f"Extracted from GAM - Types: {requested_type_values}",
+        config_type=config_type,
         config_data=result["data"],
         is_template=request.save_as_template,
-        extraction_errors={"errors": errors, "failed_types": [t.value for t in failed_types]} if errors else None
+        extraction_errors={"errors": errors, "failed_types": failed_type_values} if errors else None
     )
     
-    db.add(db_config)
-    await db.commit()
-    await db.refresh(db_config)
-    
-    # Automatically run security analysis on the extracted configuration
-    security_service = SecurityService()
-    findings = security_service.analyze_configuration(
-        db_config.config_data,
-        db_config.config_type
-    )
-    
-    # Save security findings
-    for finding in findings:
-        db_finding = SecurityAnalysis(
-            configuration_id=db_config.id,
-            severity=finding["severity"],
-            category=finding.get("category"),
-            title=finding["title"],
-            description=finding["description"],
-            recommendation=finding["recommendation"],
-            affected_settings=finding.get("affected_settings"),
-            remediation_steps=finding.get("remediation_steps"),
-            remediation_actions=finding.get("remediation_actions")
-        )
-        db.add(db_finding)
-    
-    await db.commit()
+    # Save the configuration and its findings in a single transaction
+    async with db.begin():
+        db.add(db_config)
+        # Flush to get the id for the findings
+        await db.flush()
+        
+        # Save security findings in a single multi-row INSERT
+        if findings:
+            await db.execute(
+                insert(SecurityAnalysis),
+                [
+                    {
+                        "configuration_id": db_config.id,
+                        "severity": finding["severity"],
+                        "category": finding.get("category"),
+                        "title": finding["title"],
+                        "description": finding["description"],
+                        "recommendation": finding["recommendation"],
+                        "affected_settings": finding.get("affected_settings"),
+                        "remediation_steps": finding.get("remediation_steps"),
+                        "remediation_actions": finding.get("remediation_actions")
+                    }
+                    for finding in findings
+                ]
+            )
     
     return GAMExtractResponse(
         success=True,
         message="Configuration extracted successfully" if not errors else f"Partially extracted ({len(errors)} errors)",
         configuration_id=db_config.id,
         extracted_types=request.config_types,
-        total_items=total_items,
+        total_items=result["total_items"],
         errors=errors if errors else None,
         failed_types=failed_types if failed_types else None
     )
 
 
 @router.get("/test-connection")
-async def test_gam_connection():
+async def test_gam_connection(
+    gam_service: GAMService = Depends(get_gam_service)
+):
     """Test GAM connection"""
-    gam_service = GAMService()
-    
     # Try a simple command
     result = await gam_service._run_gam_command(["version"])
     
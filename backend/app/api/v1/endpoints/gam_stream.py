@@ -74,36 +74,35 @@ async def extraction_progress_generator(
             yield f"data: {json.dumps({'status': 'partial_error', 'message': f'Completed with {len(errors)} errors', 'errors': errors})}\n\n"
             return
         
+        config_type = config_types[0] if len(config_types) == 1 else ConfigType.OTHER
+        
+        # Automatically run security analysis before opening a transaction, so
+        # no connection is held while waiting on the analysis or the client
+        yield f"data: {json.dumps({'status': 'analyzing', 'message': 'Running security analysis...', 'progress': 90})}\n\n"
+        
+        security_service = SecurityService()
+        findings = security_service.analyze_configuration(results, config_type)
+        
         # Save to database
-        yield f"data: {json.dumps({'status': 'saving', 'message': 'Saving to database...', 'progress': 90})}\n\n"
+        yield f"data: {json.dumps({'status': 'saving', 'message': 'Saving to database...', 'progress': 95})}\n\n"
         
         config_name = template_name if save_as_template else f"GAM Extract {', '.join(results.keys())}"
         
         db_config = Configuration(
             name=config_name,
             description=f"Extracted from GAM - Types: {', '.join(results.keys())}",
-            config_type=config_types[0] if len(config_types) == 1 else ConfigType.OTHER,
+            config_type=config_type,
             config_data=results,
             is_template=save_as_template
         )
         
         db.add(db_config)
-        await db.commit()
-        await db.refresh(db_config)
-        
-        # Automatically run security analysis
-        yield f"data: {json.dumps({'status': 'analyzing', 'message': 'Running security analysis...', 'progress': 95})}\n\n"
-        
-        security_service = SecurityService()
-        findings = security_service.analyze_configuration(
-            db_config.config_data,
-            db_config.config_type
-        )
+        # Flush to get the id; committed together with the findings
+        await db.flush()
         
         # Save security findings
-        findings_count = 0
-        for finding in findings:
-            db_finding = SecurityAnalysis(
+        db.add_all([
+            SecurityAnalysis(
                 configuration_id=db_config.id,
                 severity=finding["severity"],
                 category=finding.get("category"),
@@ -114,8 +113,9 @@ async def extraction_progress_generator(
                 remediation_steps=finding.get("remediation_steps"),
                 remediation_actions=finding.get("remediation_actions")
             )
-            db.add(db_finding)
-            findings_count += 1
+            for finding in findings
+        ])
+        findings_count = len(findings)
         
         await db.commit()
         
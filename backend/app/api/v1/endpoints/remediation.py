@@ -1,75 +1,219 @@
 """Remediation endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import uuid
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.db.base import get_db
-from app.db.models import Configuration, SecurityAnalysis, ConfigType
-from app.schemas.remediation import RemediationRequest, RemediationResponse
-from app.services.gam_service import GAMService
-from app.services.security_service import SecurityService
+from sqlalchemy import func, insert, select
+from app.db.base import AsyncSessionLocal, get_db
+from app.db.models import Configuration, SecurityAnalysis, ConfigType, SeverityLevel
+from app.schemas.remediation import RemediationRequest, RemediationResponse, RemediationJobResponse
+from app.services.gam_service import GAMService, get_gam_service
+from app.services.security_service import SecurityService, get_security_service
 
 router = APIRouter()
 
 
-@router.post("/execute", response_model=RemediationResponse)
+class RemediationPlan(NamedTuple):
+    """How to execute and verify a remediation action"""
+    gam_args: Callable[[Any], List[str]]
+    rescan_types: List[ConfigType]
+
+
+# Supported remediation actions, keyed by action_id. Parameters are
+# validated by the matching RemediationRequest schema.
+REMEDIATION_PLANS: Dict[str, RemediationPlan] = {
+    "enforce_2fa": RemediationPlan(
+        gam_args=lambda p: ["update", "user", p.user_email, "enforcein2sv", "true"],
+        rescan_types=[ConfigType.USER],
+    ),
+    "revoke_oauth_token": RemediationPlan(
+        gam_args=lambda p: ["user", p.user, "revoke", "token", p.client_id],
+        rescan_types=[ConfigType.OAUTH_TOKENS],
+    ),
+}
+
+
+# Status of post-remediation rescans, keyed by job id. Jobs live in this
+# process only; the oldest are dropped once the limit is reached.
+MAX_RESCAN_JOBS = 1000
+_rescan_jobs: Dict[str, Dict[str, Any]] = {}
+
+
+def _canonical_settings(affected_settings: Any) -> str:
+    """Serialise affected_settings to a stable, hashable key"""
+    return json.dumps(affected_settings, sort_keys=True, default=str)
+
+
+async def _get_severity_counts(configuration_id: int) -> Optional[Dict[SeverityLevel, int]]:
+    """Count a configuration's findings per severity.
+    
+    Uses its own session so it can run concurrently with other work on the
+    request session. Returns None if the query fails, so a database error
+    never hides the result of a GAM command running alongside it.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(SecurityAnalysis.severity, func.count())
+                .where(SecurityAnalysis.configuration_id == configuration_id)
+                .group_by(SecurityAnalysis.severity)
+            )
+            return dict(result.all())
+    except Exception as e:
+        print(f"Error counting findings for configuration {configuration_id}: {str(e)}")
+        return None
+
+
+async def _rescan_after_remediation(
+    job_id: str,
+    plan: RemediationPlan,
+    config_name: str,
+    finding_title: str,
+    finding_affected_settings: Any
+) -> None:
+    """Re-extract and re-analyze configuration after a remediation"""
+    job = _rescan_jobs.get(job_id)
+    if job is None:
+        # Evicted before it started; nobody can poll for it any more
+        return
+    job["status"] = "running"
+    gam_service = get_gam_service()
+    security_service = get_security_service()
+    
+    try:
+        # Extract fresh configuration
+        extract_result = await gam_service.extract_all_configs(plan.rescan_types)
+        
+        if not extract_result["success"]:
+            job["status"] = "failed"
+            job["error"] = "; ".join(extract_result["errors"] or [])
+            return
+        
+        config_type = plan.rescan_types[0] if len(plan.rescan_types) == 1 else ConfigType.OTHER
+        
+        # Run security analysis on new config in a worker thread
+        new_findings = await asyncio.to_thread(
+            security_service.analyze_configuration,
+            extract_result["data"],
+            config_type
+        )
+        
+        # Save the new configuration and its findings in a single transaction
+        async with AsyncSessionLocal() as db, db.begin():
+            new_config = Configuration(
+                name=f"Post-Remediation: {config_name}",
+                description=f"Re-extracted after fixing: {finding_title}",
+                config_type=config_type,
+                config_data=extract_result["data"],
+                is_template=False
+            )
+            db.add(new_config)
+            # Flush to get the id for the findings
+            await db.flush()
+            new_config_id = new_config.id
+            
+            # Save new findings in a single multi-row INSERT
+            if new_findings:
+                await db.execute(
+                    insert(SecurityAnalysis),
+                    [
+                        {
+                            "configuration_id": new_config_id,
+                            "severity": new_finding["severity"],
+                            "category": new_finding.get("category"),
+                            "title": new_finding["title"],
+                            "description": new_finding["description"],
+                            "recommendation": new_finding["recommendation"],
+                            "affected_settings": new_finding.get("affected_settings"),
+                            "remediation_steps": new_finding.get("remediation_steps")
+                        }
+                        for new_finding in new_findings
+                    ]
+                )
+        
+        # Check if the specific finding is resolved
+        remaining_findings = {
+            (f["title"], _canonical_settings(f.get("affected_settings")))
+            for f in new_findings
+        }
+        
+        job["status"] = "completed"
+        job["new_configuration_id"] = new_config_id
+        job["security_score_after"] = security_service.get_security_score(new_findings)
+        job["finding_resolved"] = (
+            (finding_title, _canonical_settings(finding_affected_settings))
+            not in remaining_findings
+        )
+    
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+
+
+@router.post(
+    "/execute",
+    response_model=RemediationResponse,
+    responses={
+        202: {
+            "model": RemediationResponse,
+            "description": "Remediation executed, rescan scheduled"
+        }
+    }
+)
 async def execute_remediation(
-    request: RemediationRequest,
-    db: AsyncSession = Depends(get_db)
+    raw_request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    request: RemediationRequest = Body(..., discriminator="action_id"),
+    db: AsyncSession = Depends(get_db),
+    gam_service: GAMService = Depends(get_gam_service),
+    security_service: SecurityService = Depends(get_security_service)
 ):
-    """Execute a remediation action"""
-    # Get the finding
+    """Execute a remediation action
+    
+    If auto_rescan is enabled the rescan runs in the background and the
+    response is 202; poll rescan_status_url for its result.
+    """
+    # Get the finding and its configuration's name (only the columns used)
     result = await db.execute(
-        select(SecurityAnalysis).where(SecurityAnalysis.id == request.finding_id)
+        select(
+            SecurityAnalysis.configuration_id,
+            SecurityAnalysis.title,
+            SecurityAnalysis.affected_settings,
+            Configuration.name.label("config_name")
+        )
+        .outerjoin(Configuration, Configuration.id == SecurityAnalysis.configuration_id)
+        .where(SecurityAnalysis.id == request.finding_id)
     )
-    finding = result.scalar_one_or_none()
+    finding = result.one_or_none()
     
     if not finding:
         raise HTTPException(status_code=404, detail="Security finding not found")
     
-    # Get the configuration
-    config_result = await db.execute(
-        select(Configuration).where(Configuration.id == finding.configuration_id)
-    )
-    config = config_result.scalar_one_or_none()
-    
-    if not config:
+    if finding.config_name is None:
         raise HTTPException(status_code=404, detail="Configuration not found")
     
-    # Get current security score
-    score_before_result = await db.execute(
-        select(SecurityAnalysis).where(SecurityAnalysis.configuration_id == finding.configuration_id)
-    )
-    analyses_before = score_before_result.scalars().all()
-    security_service = SecurityService()
-    score_before = security_service.get_security_score([{"severity": a.severity} for a in analyses_before])
+    # End the read transaction so the request's connection goes back to the
+    # pool now; get_db only closes the session after background tasks finish
+    await db.commit()
     
     # Extract GAM command from finding's remediation_actions
     # Note: In production, you'd parse this from the stored finding
     # For now, we'll construct based on action_id
-    gam_service = GAMService()
-    
-    # Execute the GAM command based on action_id
-    if request.action_id == "enforce_2fa":
-        user_email = request.parameters.get("user_email")
-        if not user_email:
-            raise HTTPException(status_code=400, detail="user_email parameter required")
-        
-        gam_result = await gam_service._run_gam_command([
-            "update", "user", user_email, "enforcein2sv", "true"
-        ])
+    plan = REMEDIATION_PLANS[request.action_id]
+    gam_args = plan.gam_args(request.parameters)
     
-    elif request.action_id == "revoke_oauth_token":
-        user = request.parameters.get("user")
-        client_id = request.parameters.get("client_id")
-        if not user or not client_id:
-            raise HTTPException(status_code=400, detail="user and client_id parameters required")
-        
-        gam_result = await gam_service._run_gam_command([
-            "user", user, "revoke", "token", client_id
-        ])
-    
-    else:
-        raise HTTPException(status_code=400, detail=f"Unknown action_id: {request.action_id}")
+    # Execute the GAM command while reading the current security score
+    gam_result, severity_counts = await asyncio.gather(
+        gam_service._run_gam_command(gam_args),
+        _get_severity_counts(finding.configuration_id)
+    )
+    score_before = (
+        security_service.get_security_score_from_counts(severity_counts)
+        if severity_counts is not None else None
+    )
     
     if not gam_result["success"]:
         return RemediationResponse(
@@ -77,83 +221,51 @@ async def execute_remediation(
             message=f"Remediation failed: {gam_result.get('error')}",
             finding_id=request.finding_id,
             action_executed=request.action_id,
-            gam_output=gam_result.get("error"),
-            finding_resolved=False
+            gam_output=gam_result.get("error")
         )
     
-    # If auto_rescan is enabled, extract fresh config and re-analyze
-    new_config_id = None
-    score_after = None
-    finding_resolved = False
+    # If auto_rescan is enabled, extract fresh config and re-analyze in the background
+    job_id = None
+    status_url = None
     
-    if request.auto_rescan:
-        # Determine which config type to re-extract based on the finding
-        config_types_to_extract = []
-        
-        if request.action_id == "enforce_2fa":
-            config_types_to_extract = [ConfigType.USER]
-        elif request.action_id == "revoke_oauth_token":
-            config_types_to_extract = [ConfigType.OAUTH_TOKENS]
-        
-        # Extract fresh configuration
-        if config_types_to_extract:
-            extract_result = await gam_service.extract_all_configs(config_types_to_extract)
-            
-            if extract_result["success"]:
-                # Save new configuration
-                new_config = Configuration(
-                    name=f"Post-Remediation: {config.name}",
-                    description=f"Re-extracted after fixing: {finding.title}",
-                    config_type=config_types_to_extract[0] if len(config_types_to_extract) == 1 else ConfigType.OTHER,
-                    config_data=extract_result["data"],
-                    is_template=False
-                )
-                db.add(new_config)
-                await db.commit()
-                await db.refresh(new_config)
-                new_config_id = new_config.id
-                
-                # Run security analysis on new config
-                new_findings = security_service.analyze_configuration(
-                    new_config.config_data,
-                    new_config.config_type
-                )
-                
-                # Save new findings
-                for new_finding in new_findings:
-                    db_finding = SecurityAnalysis(
-                        configuration_id=new_config_id,
-                        severity=new_finding["severity"],
-                        category=new_finding.get("category"),
-                        title=new_finding["title"],
-                        description=new_finding["description"],
-                        recommendation=new_finding["recommendation"],
-                        affected_settings=new_finding.get("affected_settings"),
-                        remediation_steps=new_finding.get("remediation_steps")
-                    )
-                    db.add(db_finding)
-                
-                await db.commit()
-                
-                # Calculate new security score
-                score_after = security_service.get_security_score(new_findings)
-                
-                # Check if the specific finding is resolved
-                finding_resolved = not any(
-                    f["title"] == finding.title and 
-                    f.get("affected_settings") == finding.affected_settings
-                    for f in new_findings
-                )
+    if request.auto_rescan and plan.rescan_types:
+        job_id = uuid.uuid4().hex
+        while len(_rescan_jobs) >= MAX_RESCAN_JOBS:
+            _rescan_jobs.pop(next(iter(_rescan_jobs)))
+        _rescan_jobs[job_id] = {
+            "job_id": job_id,
+            "status": "pending",
+            "finding_id": request.finding_id,
+        }
+        background_tasks.add_task(
+            _rescan_after_remediation,
+            job_id,
+            plan,
+            finding.config_name,
+            finding.title,
+            finding.affected_settings
+        )
+        status_url = raw_request.app.url_path_for("get_remediation_job", job_id=job_id)
+        response.status_code = 202
     
     return RemediationResponse(
         success=True,
-        message="Remediation executed successfully" + (" and verified" if finding_resolved else ""),
+        message="Remediation executed successfully" + (", rescan in progress" if job_id else ""),
         finding_id=request.finding_id,
         action_executed=request.action_id,
         gam_output=gam_result.get("data"),
-        new_configuration_id=new_config_id,
         security_score_before=score_before,
-        security_score_after=score_after,
-        finding_resolved=finding_resolved
+        rescan_job_id=job_id,
+        rescan_status_url=status_url
     )
 
+
+@router.get("/jobs/{job_id}", response_model=RemediationJobResponse, name="get_remediation_job")
+async def get_remediation_job(job_id: str):
+    """Get the status of a post-remediation rescan"""
+    job = _rescan_jobs.get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Rescan job not found")
+    
+    return RemediationJobResponse(**job)
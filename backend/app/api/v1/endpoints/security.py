@@ -41,9 +41,8 @@ async def analyze_configuration(
     )
     
     # Save new findings
-    db_findings = []
-    for finding in findings:
-        db_finding = SecurityAnalysis(
+    db_findings = [
+        SecurityAnalysis(
             configuration_id=config_id,
             severity=finding["severity"],
             category=finding.get("category"),
@@ -54,15 +53,14 @@ async def analyze_configuration(
             remediation_steps=finding.get("remediation_steps"),
             remediation_actions=finding.get("remediation_actions")
         )
-        db.add(db_finding)
-        db_findings.append(db_finding)
+        for finding in findings
+    ]
+    db.add_all(db_findings)
     
+    # Ids and defaults are populated at flush and kept after commit
+    # (expire_on_commit=False), so no refresh is needed
     await db.commit()
     
-    # Refresh all findings
-    for finding in db_findings:
-        await db.refresh(finding)
-    
     return db_findings
 
 
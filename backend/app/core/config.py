@@ -15,6 +15,12 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "postgresql://localhost/gam_config_manager"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    # Disable app-side pooling, e.g. behind PgBouncer in transaction mode
+    DB_USE_NULL_POOL: bool = False
     
     # Security
     SECRET_KEY: str = "change-me-in-production"
@@ -1,6 +1,8 @@
 """Database base configuration"""
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
 # Convert postgresql:// to postgresql+asyncpg://
@@ -8,11 +10,32 @@ database_url = settings.DATABASE_URL
 if database_url.startswith("postgresql://"):
     database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
+
+def json_serializer(value) -> str:
+    """Serialize JSON column values with orjson"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Connection pool options (NullPool takes no sizing arguments)
+if settings.DB_USE_NULL_POOL:
+    pool_options = {"poolclass": NullPool}
+else:
+    pool_options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
 # Create async engine
 engine = create_async_engine(
     database_url,
     echo=settings.DEBUG,
     future=True,
+    pool_pre_ping=True,
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads,
+    **pool_options,
 )
 
 # Create async session factory
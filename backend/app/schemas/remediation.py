@@ -1,6 +1,6 @@
 """Remediation schemas"""
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
+from typing import List, Literal, Optional, Dict, Any, Union
+from pydantic import BaseModel, Field
 
 
 class RemediationAction(BaseModel):
@@ -13,14 +13,39 @@ class RemediationAction(BaseModel):
     parameters: Optional[Dict[str, Any]] = None
 
 
-class RemediationRequest(BaseModel):
-    """Schema for executing a remediation"""
+class Enforce2FAParams(BaseModel):
+    """Parameters for the enforce_2fa action"""
+    user_email: str = Field(..., min_length=1)
+
+
+class RevokeOAuthTokenParams(BaseModel):
+    """Parameters for the revoke_oauth_token action"""
+    user: str = Field(..., min_length=1)
+    client_id: str = Field(..., min_length=1)
+
+
+class RemediationRequestBase(BaseModel):
+    """Fields shared by all remediation requests"""
     finding_id: int
-    action_id: str
-    parameters: Optional[Dict[str, Any]] = None
     auto_rescan: bool = True
 
 
+class Enforce2FARequest(RemediationRequestBase):
+    """Schema for executing the enforce_2fa remediation"""
+    action_id: Literal["enforce_2fa"]
+    parameters: Enforce2FAParams
+
+
+class RevokeOAuthTokenRequest(RemediationRequestBase):
+    """Schema for executing the revoke_oauth_token remediation"""
+    action_id: Literal["revoke_oauth_token"]
+    parameters: RevokeOAuthTokenParams
+
+
+# Schema for executing a remediation; discriminated on action_id
+RemediationRequest = Union[Enforce2FARequest, RevokeOAuthTokenRequest]
+
+
 class RemediationResponse(BaseModel):
     """Schema for remediation response"""
     success: bool
@@ -28,8 +53,18 @@ class RemediationResponse(BaseModel):
     finding_id: int
     action_executed: str
     gam_output: Optional[str] = None
-    new_configuration_id: Optional[int] = None
     security_score_before: Optional[int] = None
+    rescan_job_id: Optional[str] = None
+    rescan_status_url: Optional[str] = None
+
+
+class RemediationJobResponse(BaseModel):
+    """Schema for the status of a post-remediation rescan"""
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed"]
+    finding_id: int
+    new_configuration_id: Optional[int] = None
     security_score_after: Optional[int] = None
     finding_resolved: bool = False
+    error: Optional[str] = None
 
@@ -2,6 +2,7 @@
 import subprocess
 import json
 import asyncio
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from app.core.config import settings
 from app.db.models import ConfigType
@@ -14,15 +15,15 @@ class GAMService:
         self.gam_path = settings.GAM_PATH
         self.config_dir = settings.GAM_CONFIG_DIR
         self.domain = settings.GAM_DOMAIN
+        
+        # Command prefix shared by every GAM invocation
+        self.base_cmd = [self.gam_path]
+        if self.config_dir:
+            self.base_cmd.extend(["config", self.config_dir])
     
     async def _run_gam_command(self, args: List[str]) -> Dict[str, Any]:
         """Run a GAM command and return the result"""
-        cmd = [self.gam_path]
-        
-        if self.config_dir:
-            cmd.extend(["config", self.config_dir])
-        
-        cmd.extend(args)
+        cmd = [*self.base_cmd, *args]
         
         try:
             # Run command asynchronously
@@ -43,11 +44,12 @@ class GAMService:
                 }
             
             # Try to parse JSON output
+            output = stdout.decode()
             try:
-                data = json.loads(stdout.decode())
+                data = json.loads(output)
             except json.JSONDecodeError:
                 # If not JSON, return as text
-                data = stdout.decode()
+                data = output
             
             return {
                 "success": True,
@@ -273,11 +275,42 @@ class GAMService:
         
         return result
     
+    async def extract_one(self, config_type: ConfigType) -> Optional[Dict[str, Any]]:
+        """Extract a single configuration type
+        
+        Returns None if the type has no GAM extractor.
+        """
+        extractors = {
+            ConfigType.USER: self.extract_users,
+            ConfigType.GROUP: self.extract_groups,
+            ConfigType.OU: self.extract_org_units,
+            ConfigType.DOMAIN: self.extract_domain_settings,
+            ConfigType.CALENDAR: self.extract_calendar_settings,
+            ConfigType.SECURITY: self.extract_security_settings,
+            ConfigType.MOBILE: self.extract_mobile_devices,
+            ConfigType.OAUTH_TOKENS: self.extract_oauth_tokens,
+            ConfigType.ADMIN_ROLES: self.extract_admin_roles,
+            ConfigType.SHARED_DRIVES: self.extract_shared_drives,
+        }
+        
+        extractor = extractors.get(config_type)
+        if extractor is None:
+            return None
+        
+        try:
+            return await extractor()
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "data": None
+            }
+    
     async def extract_all_configs(
         self,
         config_types: Optional[List[ConfigType]] = None
     ) -> Dict[str, Any]:
-        """Extract all requested configuration types"""
+        """Extract all requested configuration types concurrently"""
         if not config_types:
             config_types = [
                 ConfigType.USER,
@@ -286,45 +319,34 @@ class GAMService:
                 ConfigType.DOMAIN
             ]
         
+        extracted = await asyncio.gather(
+            *(self.extract_one(config_type) for config_type in config_types)
+        )
+        
         results = {}
         errors = []
+        total_items = 0
         
-        for config_type in config_types:
-            try:
-                if config_type == ConfigType.USER:
-                    result = await self.extract_users()
-                elif config_type == ConfigType.GROUP:
-                    result = await self.extract_groups()
-                elif config_type == ConfigType.OU:
-                    result = await self.extract_org_units()
-                elif config_type == ConfigType.DOMAIN:
-                    result = await self.extract_domain_settings()
-                elif config_type == ConfigType.CALENDAR:
-                    result = await self.extract_calendar_settings()
-                elif config_type == ConfigType.SECURITY:
-                    result = await self.extract_security_settings()
-                elif config_type == ConfigType.MOBILE:
-                    result = await self.extract_mobile_devices()
-                elif config_type == ConfigType.OAUTH_TOKENS:
-                    result = await self.extract_oauth_tokens()
-                elif config_type == ConfigType.ADMIN_ROLES:
-                    result = await self.extract_admin_roles()
-                elif config_type == ConfigType.SHARED_DRIVES:
-                    result = await self.extract_shared_drives()
-                else:
-                    continue
-                
-                if result["success"]:
-                    results[config_type.value] = result["data"]
-                else:
-                    errors.append(f"{config_type.value}: {result['error']}")
+        for config_type, result in zip(config_types, extracted):
+            if result is None:
+                continue
             
-            except Exception as e:
-                errors.append(f"{config_type.value}: {str(e)}")
+            if result["success"]:
+                data = result["data"]
+                results[config_type.value] = data
+                total_items += len(data) if isinstance(data, list) else 1
+            else:
+                errors.append(f"{config_type.value}: {result['error']}")
         
         return {
             "success": len(errors) == 0,
             "data": results,
-            "errors": errors if errors else None
+            "errors": errors if errors else None,
+            "total_items": total_items
         }
 
+
+@lru_cache(maxsize=1)
+def get_gam_service() -> GAMService:
+    """Dependency returning the process-wide GAMService instance"""
+    return GAMService()
@@ -1,4 +1,5 @@
 """Security analysis service"""
+from functools import lru_cache
 from typing import Dict, Any, List
 from app.db.models import SeverityLevel, ConfigType
 
@@ -228,6 +229,14 @@ class MobileDeviceSecurityRule(SecurityRule):
 class OAuthTokenSecurityRule(SecurityRule):
     """Check OAuth token security"""
     
+    # High-risk scopes to watch for
+    HIGH_RISK_SCOPES = (
+        "https://www.googleapis.com/auth/drive",
+        "https://mail.google.com/",
+        "https://www.googleapis.com/auth/admin.directory",
+        "https://www.googleapis.com/auth/gmail.modify"
+    )
+    
     def __init__(self):
         super().__init__(SeverityLevel.CRITICAL, "Third-Party Access")
     
@@ -239,14 +248,6 @@ class OAuthTokenSecurityRule(SecurityRule):
         if not isinstance(tokens_data, list):
             return findings
         
-        # High-risk scopes to watch for
-        high_risk_scopes = [
-            "https://www.googleapis.com/auth/drive",
-            "https://mail.google.com/",
-            "https://www.googleapis.com/auth/admin.directory",
-            "https://www.googleapis.com/auth/gmail.modify"
-        ]
-        
         for token in tokens_data:
             if not isinstance(token, dict):
                 continue
@@ -257,7 +258,7 @@ class OAuthTokenSecurityRule(SecurityRule):
             user_key = token.get("userKey", "Unknown")
             
             # Check for high-risk scopes
-            has_high_risk = any(risk_scope in scopes for risk_scope in high_risk_scopes)
+            has_high_risk = any(risk_scope in scopes for risk_scope in self.HIGH_RISK_SCOPES)
             
             if has_high_risk:
                 findings.append({
@@ -344,19 +345,33 @@ class AdminRoleAssignmentRule(SecurityRule):
         return findings
 
 
+# Rules hold no per-analysis state, so one set is built at import time and
+# shared by every SecurityService
+DEFAULT_RULES = (
+    TwoFactorAuthRule(),
+    PasswordPolicyRule(),
+    ExternalSharingRule(),
+    AdminRoleRule(),
+    MobileDeviceSecurityRule(),
+    OAuthTokenSecurityRule(),
+    AdminRoleAssignmentRule(),
+)
+
+
 class SecurityService:
     """Service for analyzing security configurations"""
     
+    # Points deducted from the score per finding, by severity
+    SEVERITY_DEDUCTIONS = {
+        SeverityLevel.CRITICAL: 25,
+        SeverityLevel.HIGH: 15,
+        SeverityLevel.MEDIUM: 10,
+        SeverityLevel.LOW: 5,
+        SeverityLevel.INFO: 2,
+    }
+    
     def __init__(self):
-        self.rules = [
-            TwoFactorAuthRule(),
-            PasswordPolicyRule(),
-            ExternalSharingRule(),
-            AdminRoleRule(),
-            MobileDeviceSecurityRule(),
-            OAuthTokenSecurityRule(),
-            AdminRoleAssignmentRule(),
-        ]
+        self.rules = DEFAULT_RULES
     
     def analyze_configuration(
         self,
@@ -384,20 +399,26 @@ class SecurityService:
         if not findings:
             return 100
         
-        # Deduct points based on severity
-        deductions = {
-            SeverityLevel.CRITICAL: 25,
-            SeverityLevel.HIGH: 15,
-            SeverityLevel.MEDIUM: 10,
-            SeverityLevel.LOW: 5,
-            SeverityLevel.INFO: 2,
-        }
-        
         total_deduction = sum(
-            deductions.get(finding.get("severity", SeverityLevel.INFO), 0)
+            self.SEVERITY_DEDUCTIONS.get(finding.get("severity", SeverityLevel.INFO), 0)
             for finding in findings
         )
         
         score = max(0, 100 - total_deduction)
         return score
+    
+    def get_security_score_from_counts(self, severity_counts: Dict[SeverityLevel, int]) -> int:
+        """Calculate a security score (0-100) from per-severity finding counts"""
+        total_deduction = sum(
+            self.SEVERITY_DEDUCTIONS.get(severity, 0) * count
+            for severity, count in severity_counts.items()
+        )
+        
+        score = max(0, 100 - total_deduction)
+        return score
+
 
+@lru_cache(maxsize=1)
+def get_security_service() -> SecurityService:
+    """Dependency returning the process-wide SecurityService instance"""
+    return SecurityService()
@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tantml/react-query'
 import {
@@ -25,6 +25,13 @@ import {
 import { ArrowBack, Security as SecurityIcon, CompareArrows, CheckCircle, Error as ErrorIcon, Build as BuildIcon } from '@mui/icons-material'
 import { configurationsApi, securityApi, comparisonsApi, remediationApi } from '@/services/api'
 
+// Poll the background rescan every 2s for up to 3 minutes
+const RESCAN_POLL_INTERVAL_MS = 2000
+const RESCAN_TIMEOUT_MS = 3 * 60 * 1000
+
+const isRescanFinished = (startedAt: number, status?: string, updatedAt = 0) =>
+  status === 'completed' || status === 'failed' || updatedAt - startedAt >= RESCAN_TIMEOUT_MS
+
 const ConfigurationDetail = () => {
   const { id } = useParams<{ id: string }>()
   const navigate = useNavigate()
@@ -36,6 +43,7 @@ const ConfigurationDetail = () => {
   const [selectedRemediation, setSelectedRemediation] = useState<{findingId: number; actionId: string; label: string; parameters?: any} | null>(null)
   const [snackbarOpen, setSnackbarOpen] = useState(false)
   const [snackbarMessage, setSnackbarMessage] = useState('')
+  const [rescan, setRescan] = useState<{configId?: string; jobId: string; scoreBefore?: number; startedAt: number} | null>(null)
 
   const { data: config, isLoading } = useQuery({
     queryKey: ['configuration', id],
@@ -59,6 +67,55 @@ const ConfigurationDetail = () => {
     queryFn: () => configurationsApi.list().then((res) => res.data),
   })
 
+  // Only follow a rescan started from the configuration being shown
+  const activeRescan = rescan?.configId === id ? rescan : null
+
+  const { data: rescanJob, dataUpdatedAt: rescanJobUpdatedAt, isError: rescanJobUnavailable } = useQuery({
+    queryKey: ['remediation-job', activeRescan?.jobId],
+    queryFn: () => remediationApi.getJob(activeRescan?.jobId ?? '').then((res) => res.data),
+    enabled: !!activeRescan,
+    // Job status lives in server memory; a 404 means it is gone, so don't retry
+    retry: false,
+    refetchInterval: (query) =>
+      !activeRescan || isRescanFinished(activeRescan.startedAt, query.state.data?.status, query.state.dataUpdatedAt)
+        ? false
+        : RESCAN_POLL_INTERVAL_MS,
+  })
+
+  // Report the rescan result once it is known
+  useEffect(() => {
+    if (!activeRescan) return
+    
+    let message: string
+    if (rescanJobUnavailable) {
+      message = '⚠️ Remediation executed, but the rescan result is unavailable. Re-run the security analysis to verify.'
+    } else if (!rescanJob || !isRescanFinished(activeRescan.startedAt, rescanJob.status, rescanJobUpdatedAt)) {
+      return
+    } else if (rescanJob.status === 'failed') {
+      message = `⚠️ Remediation executed, but the rescan failed${rescanJob.error ? `: ${rescanJob.error}` : '.'}`
+    } else if (rescanJob.status !== 'completed') {
+      message = '⚠️ Remediation executed, but the rescan is taking longer than expected. Check the configurations list later.'
+    } else if (rescanJob.finding_resolved) {
+      message = `✅ Issue fixed! Security score improved from ${activeRescan.scoreBefore}/100 to ${rescanJob.security_score_after}/100`
+    } else {
+      message = '⚠️ Remediation executed but issue may still exist. Check the new configuration.'
+    }
+    
+    setRescan(null)
+    setSnackbarMessage(message)
+    setSnackbarOpen(true)
+    
+    // Refresh data
+    queryClient.invalidateQueries({ queryKey: ['security-analyses', id] })
+    queryClient.invalidateQueries({ queryKey: ['security-score', id] })
+    queryClient.invalidateQueries({ queryKey: ['configurations'] })
+    
+    // Navigate to new config if created
+    if (rescanJob?.status === 'completed' && rescanJob.new_configuration_id) {
+      navigate(`/configurations/${rescanJob.new_configuration_id}`)
+    }
+  }, [activeRescan, rescanJob, rescanJobUpdatedAt, rescanJobUnavailable, id, navigate, queryClient])
+
   const analyzeMutation = useMutation({
     mutationFn: () => securityApi.analyze(Number(id)),
     onSuccess: () => {
@@ -80,34 +137,35 @@ const ConfigurationDetail = () => {
   })
 
   const remediationMutation = useMutation({
-    mutationFn: (data: {findingId: number; actionId: string; parameters?: any}) =>
+    mutationFn: (data: {configId?: string; findingId: number; actionId: string; parameters?: any}) =>
       remediationApi.execute({
         finding_id: data.findingId,
         action_id: data.actionId,
         parameters: data.parameters,
         auto_rescan: true
       }),
-    onSuccess: (response) => {
+    onSuccess: ({ data: response }, variables) => {
       setRemediationDialogOpen(false)
       
-      const message = response.finding_resolved 
-        ? `✅ Issue fixed! Security score improved from ${response.security_score_before}/100 to ${response.security_score_after}/100`
-        : `⚠️ Remediation executed but issue may still exist. Check the new configuration.`
-      
-      setSnackbarMessage(message)
-      setSnackbarOpen(true)
-      
-      // Refresh data
-      queryClient.invalidateQueries({ queryKey: ['security-analyses', id] })
-      queryClient.invalidateQueries({ queryKey: ['security-score', id] })
-      queryClient.invalidateQueries({ queryKey: ['configurations'] })
+      if (!response.success) {
+        setSnackbarMessage(`❌ ${response.message}`)
+        setSnackbarOpen(true)
+        return
+      }
       
-      // Navigate to new config if created
-      if (response.new_configuration_id) {
-        setTimeout(() => {
-          navigate(`/configurations/${response.new_configuration_id}`)
-        }, 2000)
+      // The rescan runs in the background; the remediation-job query follows it
+      if (response.rescan_job_id) {
+        setRescan({
+          configId: variables.configId,
+          jobId: response.rescan_job_id,
+          scoreBefore: response.security_score_before,
+          startedAt: Date.now(),
+        })
+        setSnackbarMessage('Remediation executed. Re-scanning configuration...')
+      } else {
+        setSnackbarMessage('✅ Remediation executed successfully.')
       }
+      setSnackbarOpen(true)
     },
     onError: () => {
       setSnackbarMessage('❌ Remediation failed. Please try manually.')
@@ -122,7 +180,7 @@ const ConfigurationDetail = () => {
 
   const executeRemediation = () => {
     if (selectedRemediation) {
-      remediationMutation.mutate(selectedRemediation)
+      remediationMutation.mutate({ ...selectedRemediation, configId: id })
     }
   }
 
@@ -94,11 +94,21 @@ export const remediationApi = {
       finding_id: number
       action_executed: string
       gam_output?: string
-      new_configuration_id?: number
       security_score_before?: number
+      rescan_job_id?: string
+      rescan_status_url?: string
+    }>('/remediation/execute', data),
+  
+  getJob: (jobId: string) =>
+    api.get<{
+      job_id: string
+      status: 'pending' | 'running' | 'completed' | 'failed'
+      finding_id: number
+      new_configuration_id?: number
       security_score_after?: number
       finding_resolved: boolean
-    }>('/remediation/execute', data),
+      error?: string
+    }>(`/remediation/jobs/${jobId}`),
 }
 
 export default api